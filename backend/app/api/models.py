@@ -2,24 +2,24 @@
 Pydantic models for API requests and responses.
 """
 
-from typing import List, Optional, Tuple
+from typing import Optional, Tuple
 from pydantic import BaseModel
 
 
 class BoardState(BaseModel):
     """Board state model."""
-    board: List[List[int]]
+    board: str
     current_player: int
     black_score: int
     white_score: int
     game_over: bool
     winner: Optional[int]
-    valid_moves: List[Tuple[int, int]]
+    valid_moves: str
 
 
 class MoveRequest(BaseModel):
     """Move request model."""
-    board: List[List[int]]
+    board: str
     row: int
     col: int
     player: int
@@ -27,7 +27,7 @@ class MoveRequest(BaseModel):
 
 class CPUMoveRequest(BaseModel):
     """CPU move request model."""
-    board: List[List[int]]
+    board: str
     player: int
     difficulty: int = 4
 
@@ -35,7 +35,7 @@ class CPUMoveRequest(BaseModel):
 class CPUMoveResponse(BaseModel):
     """CPU move response model."""
     move: Optional[Tuple[int, int]]
-    new_board: List[List[int]]
+    new_board: str
     black_score: int
     white_score: int
-    valid_moves: List[Tuple[int, int]]
+    valid_moves: str
@@ -0,0 +1,40 @@
+"""
+Response classes for the API.
+"""
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        """Serialize content, passing numpy arrays and scalars through."""
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ResponseCache:
+    """Bounded LRU cache of rendered response bodies."""
+
+    def __init__(self, maxsize: int) -> None:
+        """Initialize an empty cache holding at most maxsize bodies."""
+        self.maxsize = maxsize
+        self._bodies: OrderedDict[bytes, bytes] = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Get the body stored under key, if any."""
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+        return body
+
+    def put(self, key: bytes, body: bytes) -> None:
+        """Store a body, evicting the least recently used one when full."""
+        self._bodies[key] = body
+        self._bodies.move_to_end(key)
+        if len(self._bodies) > self.maxsize:
+            self._bodies.popitem(last=False)
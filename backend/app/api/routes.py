@@ -2,63 +2,243 @@
 API routes for Othello game.
 """
 
-from typing import List, Optional, Tuple
-from fastapi import APIRouter, HTTPException
-import numpy as np
-from app.game.othello import OthelloBoard, OthelloCPU, Player
+import asyncio
+import hashlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from fastapi import APIRouter, HTTPException, Request, Response
+import orjson
+from pydantic import BaseModel
+from app.game.othello import OthelloBoard, OthelloBoard8, OthelloCPU, Player
 from app.api.models import BoardState, MoveRequest, CPUMoveRequest, CPUMoveResponse
+from app.api.responses import ORJSONResponse, ResponseCache
 
 router = APIRouter(prefix="/api/game", tags=["game"])
 
-# グローバル変数でゲーム状態を管理
-current_game_board = OthelloBoard()
+# 盤面は黒・白それぞれのビットボード（ビット番号 = 行 * 8 + 列）を
+# 16桁の16進数で表し、黒・白の順に連結した32文字で送受信する
+# 有効な手も同じ番号付けのビットマスクを16桁の16進数で送る
 
 
-def board_to_list(board: OthelloBoard) -> List[List[int]]:
-    """Convert OthelloBoard to list representation."""
-    return board.board.tolist()
+def board_to_str(board: OthelloBoard) -> str:
+    """Convert OthelloBoard to its 32-character wire representation."""
+    return f"{board.black:016x}{board.white:016x}"
 
 
-def list_to_board(board_list: List[List[int]]) -> OthelloBoard:
-    """Convert list representation to OthelloBoard."""
-    board = OthelloBoard()
-    board.board = np.array(board_list)
+_HEX_DIGITS = frozenset("0123456789abcdef")
+
+
+def _normalize_board_str(board_str: str) -> str:
+    """Check a wire board string and return it in lower case."""
+    # bytes.fromhexは空白を読み飛ばすので、32文字すべてが16進数字かを先に確かめる
+    # （小文字にそろえて、キャッシュや定石の照合で同じ盤面が同じ文字列になるようにする）
+    board_str = board_str.lower()
+    if len(board_str) != 32 or not _HEX_DIGITS.issuperset(board_str):
+        raise ValueError("Board must be 32 hexadecimal characters")
+    return board_str
+
+
+def str_to_board(board_str: str) -> OthelloBoard:
+    """Convert the 32-character wire representation to OthelloBoard."""
+    raw = bytes.fromhex(_normalize_board_str(board_str))
+    black = int.from_bytes(raw[:8], "big")
+    white = int.from_bytes(raw[8:], "big")
+    if black & white:
+        raise ValueError("Black and white bitboards overlap")
+    board = OthelloBoard8()
+    board.black, board.white = black, white
     return board
 
 
+def moves_to_str(moves: Iterable[Tuple[int, int]]) -> str:
+    """Convert moves to their 16-character wire bitmask."""
+    mask = 0
+    for row, col in moves:
+        mask |= 1 << (row * 8 + col)
+    return f"{mask:016x}"
+
+
+def str_to_moves(moves_str: str) -> List[Tuple[int, int]]:
+    """Convert the 16-character wire bitmask to moves."""
+    mask = int(moves_str, 16)
+    return [divmod(square, 8) for square in range(64) if mask >> square & 1]
+
+
+def _request_body_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Build the OpenAPI requestBody for a handler that parses its own body."""
+    return {
+        "requestBody": {
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+            "required": True,
+        }
+    }
+
+
+def _parse_json_object(body: bytes) -> Dict[str, Any]:
+    """Parse a request body that must be a JSON object."""
+    data = orjson.loads(body)
+    if not isinstance(data, dict):
+        raise ValueError("Request body must be a JSON object")
+    return data
+
+
+def _get_field(data: Dict[str, Any], name: str, kind: type, default: Any = None) -> Any:
+    """Get a field of the given type from a parsed request body."""
+    value = data.get(name, default)
+    # boolはintのサブクラスなので厳密に型を比較する
+    if type(value) is not kind:
+        raise ValueError(f"Field '{name}' must be of type {kind.__name__}")
+    return value
+
+
+def _parse_player(value: int) -> Player:
+    """Get the player to move, which must be black (1) or white (-1)."""
+    # Player(0)は空きマスを表すので手番としては受け付けない
+    if value not in (Player.BLACK.value, Player.WHITE.value):
+        raise ValueError("Player must be 1 (black) or -1 (white)")
+    return Player(value)
+
+
+def _clamp_difficulty(value: int) -> int:
+    """Clamp a requested difficulty to the supported range."""
+    # 探索の深さが難易度で決まるので、範囲外の値で重い探索をさせない
+    return min(max(value, _MIN_DIFFICULTY), _MAX_DIFFICULTY)
+
+
+# OthelloCPUは手番と難易度ごとに1つを使い回す（置換表は探索のたびに作り直される）
+@lru_cache(maxsize=16)
+def _get_cpu(player_value: int, difficulty: int) -> OthelloCPU:
+    """Get the shared CPU player for a player and difficulty."""
+    return OthelloCPU(Player(player_value), difficulty)
+
+
+def _search_cpu_move(
+    board_str: str, player_value: int, difficulty: int
+) -> Optional[Tuple[int, int]]:
+    """Run the CPU search on a wire board."""
+    return _get_cpu(player_value, difficulty).get_move(str_to_board(board_str))
+
+
+# 難易度2以上の探索は盤面・手番・難易度だけで決まるので結果を使い回す
+# （プロセスプールへ渡せるよう、名前で参照できる関数として定義する）
+@lru_cache(maxsize=65536)
+def _cached_cpu_move(
+    board_str: str, player_value: int, difficulty: int
+) -> Optional[Tuple[int, int]]:
+    """Run the CPU search on a wire board, reusing earlier results."""
+    return _search_cpu_move(board_str, player_value, difficulty)
+
+
+@lru_cache(maxsize=65536)
+def _cached_valid_moves(board_str: str, player_value: int) -> str:
+    """Get the wire valid moves of a player on a wire board."""
+    return moves_to_str(str_to_board(board_str).get_valid_moves(Player(player_value)))
+
+
+_cpu_move_responses = ResponseCache(maxsize=4096)
+_CPU_MOVE_MAX_AGE = 3600
+_MIN_DIFFICULTY = 1
+_MAX_DIFFICULTY = 5
+
+
+def _cpu_move_payload(
+    board: OthelloBoard, player: Player, move: Optional[Tuple[int, int]]
+) -> Dict[str, Any]:
+    """Apply the CPU move to the board and build the response payload."""
+    if move is None:
+        # No valid moves for CPU
+        black_score, white_score = board.get_score()
+        return {
+            "move": None,
+            "new_board": board_to_str(board),
+            "black_score": black_score,
+            "white_score": white_score,
+            "valid_moves": moves_to_str(board.get_valid_moves(player)),
+        }
+
+    # Make the CPU move
+    success = board.make_move(move[0], move[1], player)
+    if not success:
+        raise HTTPException(status_code=500, detail="CPU move failed")
+
+    # Calculate new state
+    black_score, white_score = board.get_score()
+    next_player = Player.WHITE if player == Player.BLACK else Player.BLACK
+    valid_moves = board.get_valid_moves(next_player)
+
+    return {
+        "move": move,
+        "new_board": board_to_str(board),
+        "black_score": black_score,
+        "white_score": white_score,
+        "valid_moves": moves_to_str(valid_moves),
+    }
+
+
+# 初期局面は常に同じなので、その応答は起動時に一度だけ作っておく
+_initial_board = OthelloBoard8()
+_initial_black_score, _initial_white_score = _initial_board.get_score()
+_NEW_GAME_BODY = ORJSONResponse(content={
+    "board": board_to_str(_initial_board),
+    "current_player": Player.BLACK.value,
+    "black_score": _initial_black_score,
+    "white_score": _initial_white_score,
+    "game_over": _initial_board.is_game_over(),
+    "winner": None,
+    "valid_moves": moves_to_str(_initial_board.get_valid_moves(Player.BLACK)),
+}).body
+_INITIAL_VALID_MOVES_BODIES = {
+    player.value: ORJSONResponse(content={
+        "valid_moves": moves_to_str(_initial_board.get_valid_moves(player)),
+    }).body
+    for player in Player
+}
+
+# 初期局面でのCPUの手（定石）。起動時に build_opening_book で埋める
+_INITIAL_BOARD_STR = board_to_str(_initial_board)
+_opening_book: Dict[Tuple[int, int], Optional[Tuple[int, int]]] = {}
+
+
+def build_opening_book() -> None:
+    """Search the initial position once for every player and difficulty."""
+    if _opening_book:
+        return
+    # 難易度1はランダムなので定石にしない
+    for player in (Player.BLACK, Player.WHITE):
+        for difficulty in range(2, 6):
+            _opening_book[player.value, difficulty] = _search_cpu_move(
+                _INITIAL_BOARD_STR, player.value, difficulty
+            )
+
+
 @router.get("/new", response_model=BoardState)
 async def new_game():
     """Start a new game."""
-    global current_game_board
-    current_game_board = OthelloBoard()
-
-    black_score, white_score = current_game_board.get_score()
-    valid_moves = current_game_board.get_valid_moves(Player.BLACK)
+    return Response(content=_NEW_GAME_BODY, media_type="application/json")
 
-    return BoardState(
-        board=board_to_list(current_game_board),
-        current_player=Player.BLACK.value,
-        black_score=black_score,
-        white_score=white_score,
-        game_over=current_game_board.is_game_over(),
-        winner=None,
-        valid_moves=valid_moves
-    )
 
-
-@router.post("/move", response_model=BoardState)
-async def make_move(move_request: MoveRequest):
+@router.post(
+    "/move",
+    response_model=BoardState,
+    openapi_extra=_request_body_schema(MoveRequest),
+)
+async def make_move(request: Request):
     """Make a move on the board."""
     try:
-        # Convert list to OthelloBoard
-        board = list_to_board(move_request.board)
-        player = Player(move_request.player)
+        # MoveRequestによる検証を省き、本文を直接読む
+        data = _parse_json_object(await request.body())
+        row = _get_field(data, "row", int)
+        col = _get_field(data, "col", int)
+
+        # Convert wire string to OthelloBoard
+        board = str_to_board(_get_field(data, "board", str))
+        player = _parse_player(_get_field(data, "player", int))
 
         # Validate and make move
-        if not board.is_valid_move(move_request.row, move_request.col, player):
+        if not board.is_valid_move(row, col, player):
             raise HTTPException(status_code=400, detail="Invalid move")
 
-        success = board.make_move(move_request.row, move_request.col, player)
+        success = board.make_move(row, col, player)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to make move")
 
@@ -67,8 +247,8 @@ async def make_move(move_request: MoveRequest):
         next_player = Player.WHITE if player == Player.BLACK else Player.BLACK
         valid_moves = board.get_valid_moves(next_player)
 
-        # Check if game is over
-        game_over = board.is_game_over()
+        # Check if game is over (次の手番に合法手があれば終局ではない)
+        game_over = False if valid_moves else board.is_game_over()
         winner = None
         if game_over:
             if black_score > white_score:
@@ -76,15 +256,15 @@ async def make_move(move_request: MoveRequest):
             elif white_score > black_score:
                 winner = Player.WHITE.value
 
-        return BoardState(
-            board=board_to_list(board),
-            current_player=next_player.value,
-            black_score=black_score,
-            white_score=white_score,
-            game_over=game_over,
-            winner=winner,
-            valid_moves=valid_moves
-        )
+        return ORJSONResponse(content={
+            "board": board_to_str(board),
+            "current_player": next_player.value,
+            "black_score": black_score,
+            "white_score": white_score,
+            "game_over": game_over,
+            "winner": winner,
+            "valid_moves": moves_to_str(valid_moves),
+        })
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -92,46 +272,91 @@ async def make_move(move_request: MoveRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/cpu-move", response_model=CPUMoveResponse)
-async def get_cpu_move(cpu_request: CPUMoveRequest):
-    """Get CPU move."""
+async def _cpu_move_response(
+    request: Request,
+    board_str: str,
+    player_value: int,
+    difficulty: int,
+    cache_key: Optional[bytes],
+) -> Response:
+    """Search, apply and render the CPU move, caching it under cache_key."""
+    # Convert wire string to OthelloBoard
+    board = str_to_board(board_str)
+    player = _parse_player(player_value)
+
+    # Get CPU move (探索はCPUを占有するのでイベントループの外で実行)
+    # GILに縛られないよう、アプリのプロセスプールがあればそちらで探索する
+    pool = getattr(request.app.state, "cpu_pool", None)
+    search = _search_cpu_move if cache_key is None else _cached_cpu_move
+    book_key = (player.value, difficulty)
+    if board_str == _INITIAL_BOARD_STR and book_key in _opening_book:
+        move = _opening_book[book_key]
+    else:
+        move = await asyncio.get_running_loop().run_in_executor(
+            pool, search, board_str, player.value, difficulty
+        )
+
+    response = ORJSONResponse(content=_cpu_move_payload(board, player, move))
+    if cache_key is not None:
+        _cpu_move_responses.put(cache_key, response.body)
+    return response
+
+
+@router.get("/cpu-move", response_model=CPUMoveResponse)
+async def get_cpu_move_by_query(request: Request, b: str, p: int, d: int = 4):
+    """Get CPU move for board b, player p and difficulty d (HTTP cacheable)."""
     try:
-        # Convert list to OthelloBoard
-        board = list_to_board(cpu_request.board)
-        player = Player(cpu_request.player)
-
-        # Create CPU player
-        cpu = OthelloCPU(player, cpu_request.difficulty)
-
-        # Get CPU move
-        move = cpu.get_move(board)
-
-        if move is None:
-            # No valid moves for CPU
-            return CPUMoveResponse(
-                move=None,
-                new_board=board_to_list(board),
-                black_score=board.get_score()[0],
-                white_score=board.get_score()[1],
-                valid_moves=board.get_valid_moves(player)
-            )
+        b = _normalize_board_str(b)
+        p = _parse_player(p).value
+        d = _clamp_difficulty(d)
+        # ランダムな難易度1以外は同じクエリに同じ応答を返す
+        cacheable = d != 1
+        cache_key = f"{b}/{p}/{d}".encode() if cacheable else None
+        body = _cpu_move_responses.get(cache_key) if cache_key else None
+        if body is not None:
+            response = Response(content=body, media_type="application/json")
+        else:
+            response = await _cpu_move_response(request, b, p, d, cache_key)
+        response.headers["Cache-Control"] = (
+            f"public, max-age={_CPU_MOVE_MAX_AGE}" if cacheable else "no-store"
+        )
+        return response
 
-        # Make the CPU move
-        success = board.make_move(move[0], move[1], player)
-        if not success:
-            raise HTTPException(status_code=500, detail="CPU move failed")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Calculate new state
-        black_score, white_score = board.get_score()
-        next_player = Player.WHITE if player == Player.BLACK else Player.BLACK
-        valid_moves = board.get_valid_moves(next_player)
 
-        return CPUMoveResponse(
-            move=move,
-            new_board=board_to_list(board),
-            black_score=black_score,
-            white_score=white_score,
-            valid_moves=valid_moves
+@router.post(
+    "/cpu-move",
+    response_model=CPUMoveResponse,
+    deprecated=True,
+    openapi_extra=_request_body_schema(CPUMoveRequest),
+)
+async def get_cpu_move(request: Request):
+    """Get CPU move (deprecated: use the cacheable GET endpoint)."""
+    try:
+        # 同じリクエストには同じ応答を返すので、本文のハッシュをキーに応答を使い回す
+        # （難易度1の応答は保存しないので、本文を解析する前に引いてよい）
+        body = await request.body()
+        cache_key = hashlib.blake2b(body, digest_size=16).digest()
+        cached = _cpu_move_responses.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+
+        data = _parse_json_object(body)
+        board_str = _normalize_board_str(_get_field(data, "board", str))
+        player = _parse_player(_get_field(data, "player", int)).value
+        difficulty = _clamp_difficulty(
+            _get_field(data, "difficulty", int, default=4)
+        )
+        return await _cpu_move_response(
+            request,
+            board_str,
+            player,
+            difficulty,
+            None if difficulty == 1 else cache_key,
         )
 
     except ValueError as e:
@@ -144,19 +369,19 @@ async def get_cpu_move(cpu_request: CPUMoveRequest):
 async def get_valid_moves(player: int, board_state: Optional[str] = None):
     """Get valid moves for a player."""
     try:
-        player_enum = Player(player)
+        player_enum = _parse_player(player)
 
-        if board_state:
-            # Use provided board state
-            import json
-            board_list = json.loads(board_state)
-            board = list_to_board(board_list)
-        else:
-            # Use current game board
-            board = current_game_board
+        if not board_state:
+            # Use the initial position
+            return Response(
+                content=_INITIAL_VALID_MOVES_BODIES[player_enum.value],
+                media_type="application/json",
+            )
 
-        valid_moves = board.get_valid_moves(player_enum)
-        return {"valid_moves": valid_moves}
+        valid_moves = _cached_valid_moves(
+            _normalize_board_str(board_state), player_enum.value
+        )
+        return ORJSONResponse(content={"valid_moves": valid_moves})
 
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
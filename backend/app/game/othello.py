@@ -4,10 +4,13 @@ Othello game implementation with CPU player.
 This module provides classes for playing Othello with an AI opponent.
 """
 
+import copy
 from enum import Enum
-from typing import List, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 import numpy as np
 import random
+from app.game import othello_kernels
 
 
 class Player(Enum):
@@ -17,123 +20,331 @@ class Player(Enum):
     EMPTY = 0
 
 
+# 探索の内側ではEnumを使わず生の値で手番を表す（WHITE == -BLACK）
+BLACK, WHITE, EMPTY = Player.BLACK.value, Player.WHITE.value, Player.EMPTY.value
+
+
+@lru_cache(maxsize=None)
+def _board_geometry(size: int) -> Tuple[int, int, Tuple[Tuple[int, int], ...]]:
+    """Get the full-board mask, fill count and direction shifts for a size."""
+    full = (1 << (size * size)) - 1
+    first_col = sum(1 << (row * size) for row in range(size))
+    not_first_col = full & ~first_col
+    not_last_col = full & ~(first_col << (size - 1))
+    # (シフト量, マスク): 正なら左シフト、負なら右シフト。マスクで盤の端からの回り込みを消す
+    shifts = (
+        (1, not_first_col), (-1, not_last_col),
+        (size, full), (-size, full),
+        (size + 1, not_first_col), (size - 1, not_last_col),
+        (-(size - 1), not_first_col), (-(size + 1), not_last_col),
+    )
+    # 一直線に並ぶ相手の石は最大 size - 2 個
+    return full, max(size - 3, 0), shifts
+
+
+def _legal_moves(own: int, opp: int, size: int) -> int:
+    """Get the bitboard of legal moves for own against opp."""
+    full, fills, shifts = _board_geometry(size)
+    empty = full & ~(own | opp)
+    moves = 0
+    for shift, mask in shifts:
+        line = opp & mask
+        if shift > 0:
+            x = (own << shift) & line
+            for _ in range(fills):
+                x |= (x << shift) & line
+            moves |= (x << shift) & mask
+        else:
+            shift = -shift
+            x = (own >> shift) & line
+            for _ in range(fills):
+                x |= (x >> shift) & line
+            moves |= (x >> shift) & mask
+    return moves & empty
+
+
+def _flips(move: int, own: int, opp: int, size: int) -> int:
+    """Get the bitboard of opp pieces flipped by placing own on move."""
+    _, fills, shifts = _board_geometry(size)
+    flips = 0
+    for shift, mask in shifts:
+        line = opp & mask
+        if shift > 0:
+            x = (move << shift) & line
+            for _ in range(fills):
+                x |= (x << shift) & line
+            if (x << shift) & mask & own:
+                flips |= x
+        else:
+            shift = -shift
+            x = (move >> shift) & line
+            for _ in range(fills):
+                x |= (x >> shift) & line
+            if (x >> shift) & mask & own:
+                flips |= x
+    return flips
+
+
+def _squares(bits: int, size: int) -> List[Tuple[int, int]]:
+    """Get the (row, col) squares of a bitboard in row-major order."""
+    squares = []
+    # 下位ビットから取り出すと行優先の順になる
+    while bits:
+        low = bits & -bits
+        squares.append(divmod(low.bit_length() - 1, size))
+        bits ^= low
+    return squares
+
+
+def _pack_cells(cells: np.ndarray) -> Tuple[int, int]:
+    """Pack a cell grid into (black, white) bitboards."""
+    flat = np.asarray(cells).ravel()
+    black = np.packbits(flat == BLACK, bitorder="little")
+    white = np.packbits(flat == WHITE, bitorder="little")
+    return (
+        int.from_bytes(black.tobytes(), "little"),
+        int.from_bytes(white.tobytes(), "little"),
+    )
+
+
+def _unpack_cells(black: int, white: int, size: int) -> np.ndarray:
+    """Unpack (black, white) bitboards into a cell grid."""
+    count = size * size
+    length = (count + 7) // 8
+    packed = np.frombuffer(
+        black.to_bytes(length, "little") + white.to_bytes(length, "little"),
+        dtype=np.uint8,
+    ).reshape(2, length)
+    bits = np.unpackbits(packed, axis=1, count=count, bitorder="little")
+    cells = bits[0].astype(np.int8) - bits[1].astype(np.int8)
+    return cells.reshape(size, size)
+
+
 class OthelloBoard:
     """Represents the Othello game board."""
     
     def __init__(self, size: int = 8) -> None:
         """Initialize the board with the given size."""
         self.size = size
-        self.board = np.zeros((size, size), dtype=int)
+        # 盤面は黒・白それぞれのビットボード（ビット番号 = 行 * size + 列）で持つ。
+        # boardのセルを書き換えたときは、次にビットボードを使う前に反映する
+        self._black = 0
+        self._white = 0
+        self._cells: Optional[np.ndarray] = None
         self._setup_initial_position()
     
     def _setup_initial_position(self) -> None:
         """Set up the initial position with four pieces in the center."""
         center = self.size // 2
-        self.board[center - 1, center - 1] = Player.WHITE.value
-        self.board[center - 1, center] = Player.BLACK.value
-        self.board[center, center - 1] = Player.BLACK.value
-        self.board[center, center] = Player.WHITE.value
-    
+        self._white |= self._bit(center - 1, center - 1) | self._bit(center, center)
+        self._black |= self._bit(center - 1, center) | self._bit(center, center - 1)
+
+    @property
+    def black(self) -> int:
+        """Get the bitboard of black pieces."""
+        self._sync()
+        return self._black
+
+    @black.setter
+    def black(self, bits: int) -> None:
+        """Set the bitboard of black pieces."""
+        self._sync()
+        self._black = bits
+
+    @property
+    def white(self) -> int:
+        """Get the bitboard of white pieces."""
+        self._sync()
+        return self._white
+
+    @white.setter
+    def white(self, bits: int) -> None:
+        """Set the bitboard of white pieces."""
+        self._sync()
+        self._white = bits
+
+    @property
+    def board(self) -> np.ndarray:
+        """Get the board as a cell grid (edits are applied to the bitboards)."""
+        if self._cells is None:
+            self._cells = _unpack_cells(self._black, self._white, self.size)
+        return self._cells
+
+    @board.setter
+    def board(self, cells: np.ndarray) -> None:
+        """Set the board from a cell grid."""
+        self._drop_cells()
+        self._black, self._white = _pack_cells(cells)
+
+    def _sync(self) -> None:
+        """Apply edits made through the cell grid to the bitboards."""
+        if self._cells is not None:
+            self._black, self._white = _pack_cells(self._cells)
+            self._drop_cells()
+
+    def _drop_cells(self) -> None:
+        """Forget the cell grid, making it read-only for anyone still holding it."""
+        if self._cells is not None:
+            # 手放したグリッドへの書き込みは盤面に反映されないので、黙って失われないようにする
+            self._cells.flags.writeable = False
+            self._cells = None
+
+    def _bit(self, row: int, col: int) -> int:
+        """Get the bitboard bit of a square."""
+        return 1 << (row * self.size + col)
+
+    def _own_and_opponent(self, player: int) -> Tuple[int, int]:
+        """Get the (own, opponent) bitboards of a raw player value."""
+        if player == BLACK:
+            return self._black, self._white
+        return self._white, self._black
+
+    def _moves(self, player: int) -> int:
+        """Get the bitboard of valid moves for a raw player value."""
+        self._sync()
+        own, opp = self._own_and_opponent(player)
+        return _legal_moves(own, opp, self.size)
+
+    def _play(self, row: int, col: int, player: int) -> bool:
+        """Make a move on an in-bounds square for a raw player value."""
+        self._sync()
+        move = self._bit(row, col)
+        if (self._black | self._white) & move:
+            return False
+
+        own, opp = self._own_and_opponent(player)
+        flips = _flips(move, own, opp, self.size)
+        if not flips:
+            return False
+
+        own |= move | flips
+        opp &= ~flips
+        if player == BLACK:
+            self._black, self._white = own, opp
+        else:
+            self._white, self._black = own, opp
+        return True
+
+    def legal_moves(self, player: Player) -> int:
+        """Get the bitboard of valid moves for the given player."""
+        return self._moves(player.value)
+
     def is_valid_move(self, row: int, col: int, player: Player) -> bool:
         """Check if a move is valid for the given player."""
         if not (0 <= row < self.size and 0 <= col < self.size):
             return False
-        
-        if self.board[row, col] != Player.EMPTY.value:
-            return False
-        
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), 
-                     (0, 1), (1, -1), (1, 0), (1, 1)]
-        
-        for dr, dc in directions:
-            if self._can_flip_in_direction(row, col, dr, dc, player):
-                return True
-        
-        return False
-    
-    def _can_flip_in_direction(
-        self, row: int, col: int, dr: int, dc: int, player: Player
-    ) -> bool:
-        """Check if pieces can be flipped in a given direction."""
-        r, c = row + dr, col + dc
-        found_opponent = False
-        
-        while 0 <= r < self.size and 0 <= c < self.size:
-            if self.board[r, c] == Player.EMPTY.value:
-                return False
-            elif self.board[r, c] == player.value:
-                return found_opponent
-            else:
-                found_opponent = True
-            
-            r += dr
-            c += dc
-        
-        return False
-    
+
+        return bool(self._moves(player.value) & self._bit(row, col))
+
     def make_move(self, row: int, col: int, player: Player) -> bool:
         """Make a move and flip the appropriate pieces."""
-        if not self.is_valid_move(row, col, player):
+        if not (0 <= row < self.size and 0 <= col < self.size):
             return False
-        
-        self.board[row, col] = player.value
-        
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), 
-                     (0, 1), (1, -1), (1, 0), (1, 1)]
-        
-        for dr, dc in directions:
-            if self._can_flip_in_direction(row, col, dr, dc, player):
-                self._flip_pieces_in_direction(row, col, dr, dc, player)
-        
-        return True
-    
-    def _flip_pieces_in_direction(
-        self, row: int, col: int, dr: int, dc: int, player: Player
-    ) -> None:
-        """Flip pieces in a given direction."""
-        r, c = row + dr, col + dc
-        
-        while 0 <= r < self.size and 0 <= c < self.size:
-            if self.board[r, c] == player.value:
-                break
-            self.board[r, c] = player.value
-            r += dr
-            c += dc
-    
+
+        return self._play(row, col, player.value)
+
     def get_valid_moves(self, player: Player) -> List[Tuple[int, int]]:
         """Get all valid moves for the given player."""
-        moves = []
-        for row in range(self.size):
-            for col in range(self.size):
-                if self.is_valid_move(row, col, player):
-                    moves.append((row, col))
-        return moves
-    
+        return _squares(self._moves(player.value), self.size)
+
     def get_score(self) -> Tuple[int, int]:
         """Get the current score (black_score, white_score)."""
-        black_score = np.sum(self.board == Player.BLACK.value)
-        white_score = np.sum(self.board == Player.WHITE.value)
-        return black_score, white_score
+        self._sync()
+        return self._black.bit_count(), self._white.bit_count()
     
     def is_game_over(self) -> bool:
         """Check if the game is over."""
-        return (len(self.get_valid_moves(Player.BLACK)) == 0 and
-                len(self.get_valid_moves(Player.WHITE)) == 0)
+        return self._moves(BLACK) == 0 and self._moves(WHITE) == 0
     
+    def snapshot(self) -> Tuple[int, int]:
+        """Get the (black, white) bitboards to restore the board to later."""
+        self._sync()
+        return self._black, self._white
+
+    def restore(self, state: Tuple[int, int]) -> None:
+        """Restore the board to a snapshot."""
+        self._drop_cells()
+        self._black, self._white = state
+
     def copy(self) -> "OthelloBoard":
         """Create a copy of the board."""
-        new_board = OthelloBoard(self.size)
-        new_board.board = self.board.copy()
+        self._sync()
+        # サブクラスの盤面もそのクラスのまま複製する
+        new_board = object.__new__(type(self))
+        new_board.size = self.size
+        new_board._black, new_board._white = self._black, self._white
+        new_board._cells = None
         return new_board
     
     def __str__(self) -> str:
         """String representation of the board."""
-        symbols = {Player.EMPTY.value: '.', Player.BLACK.value: 'B', 
-                  Player.WHITE.value: 'W'}
-        result = "  " + " ".join(str(i) for i in range(self.size)) + "\n"
-        for i, row in enumerate(self.board):
-            result += f"{i} " + " ".join(symbols[cell] for cell in row) + "\n"
-        return result
+        # WHITE, EMPTY, BLACK (-1, 0, 1) をまとめて記号の文字コードに置き換える
+        symbols = np.frombuffer(b"W.B", dtype=np.uint8)[self.board + 1]
+        lines = ["  " + " ".join(str(i) for i in range(self.size))]
+        for i, row in enumerate(symbols):
+            lines.append(f"{i} " + " ".join(row.tobytes().decode()))
+        return "\n".join(lines) + "\n"
+
+
+class OthelloBoard8(OthelloBoard):
+    """8x8 Othello board using the Numba bitboard kernels."""
+
+    def __init__(self) -> None:
+        """Initialize the 8x8 board."""
+        super().__init__(8)
+
+    def _bit(self, row: int, col: int) -> int:
+        """Get the bitboard bit of a square."""
+        return 1 << (row * 8 + col)
+
+    def _moves(self, player: int) -> int:
+        """Get the bitboard of valid moves for a raw player value."""
+        self._sync()
+        # 8x8はuint64に収まるので、サイズで分岐せずにカーネルを呼ぶ
+        if player == BLACK:
+            return othello_kernels.legal_moves(self._black, self._white)
+        return othello_kernels.legal_moves(self._white, self._black)
+
+    def _play(self, row: int, col: int, player: int) -> bool:
+        """Make a move on an in-bounds square for a raw player value."""
+        self._sync()
+        square = row * 8 + col
+        move = 1 << square
+        if (self._black | self._white) & move:
+            return False
+
+        if player == BLACK:
+            flips = othello_kernels.flips(square, self._black, self._white)
+            if not flips:
+                return False
+            self._black |= move | flips
+            self._white &= ~flips
+        else:
+            flips = othello_kernels.flips(square, self._white, self._black)
+            if not flips:
+                return False
+            self._white |= move | flips
+            self._black &= ~flips
+        return True
+
+
+# 置換表の値の種類（真の値・下界・上界）と、置換表に保持する局面数の上限
+_EXACT, _LOWER, _UPPER = 0, 1, 2
+_TT_MAX_ENTRIES = 1 << 18
+# 置換表: (黒, 白, 手番) -> (残り深さ, 値の種類, 手番側から見た値, 最善手)
+_Table = Dict[Tuple[int, int, int], Tuple[int, int, float, Tuple[int, int]]]
+# 空きマスがこの数以下なら、評価関数を使わずに終局まで読み切る
+_ENDGAME_EMPTIES = 10
+# 反復深化で、2つ前の深さの値を中心に最初に探索する窓の半分の幅
+# （評価値は手番の偶奇で振れるので、1つ前の深さの値は中心に向かない）
+_ASPIRATION_WINDOW = 25
+
+
+def warm_up() -> None:
+    """Compile the board kernels ahead of their first real use."""
+    board = OthelloBoard8()
+    board.get_valid_moves(Player.BLACK)
+    board.make_move(2, 3, Player.BLACK)
 
 
 class OthelloCPU:
@@ -144,6 +355,14 @@ class OthelloCPU:
         self.player = player
         self.opponent = Player.WHITE if player == Player.BLACK else Player.BLACK
         self.difficulty = difficulty
+        # 探索で使う生の手番の値（手番 color の側は color * self._own）
+        self._own = player.value
+        self._opp = self.opponent.value
+        self._tt: _Table = {}
+        # 読み切り用の置換表（値は石数の差なので、評価関数の値とは分けて持つ）
+        self._endgame_tt: _Table = {}
+        # 難易度1の乱数はCPUごとに持つ
+        self._rng = random.Random()
         
         # Position values for heuristic evaluation
         self.position_values = np.array([
@@ -156,6 +375,11 @@ class OthelloCPU:
             [-20, -50, -2, -2, -2, -2, -50, -20],
             [100, -20, 10, 5, 5, 10, -20, 100]
         ])
+        # 盤の大きさごとの、位置の評価の表と手の並べ替えに使うマスのまとまり
+        self._tables_by_size: Dict[
+            int, Tuple[Tuple[Tuple[int, ...], ...], Tuple[int, ...]]
+        ] = {}
+        self._use_board_size(8)
     
     def get_move(self, board: OthelloBoard) -> Optional[Tuple[int, int]]:
         """Get the best move for the CPU player."""
@@ -163,16 +387,64 @@ class OthelloCPU:
         if not valid_moves:
             return None
         
+        search = self._for_search(board)
         if self.difficulty == 1:
-            return self._get_random_move(valid_moves)
+            return search._get_random_move(valid_moves)
         elif self.difficulty == 2:
-            return self._get_greedy_move(board, valid_moves)
+            return search._get_greedy_move(board, valid_moves)
         else:
-            return self._get_minimax_move(board, valid_moves)
+            return search._get_minimax_move(board)
+
+    def _for_search(self, board: OthelloBoard) -> "OthelloCPU":
+        """Get a copy of the CPU with empty tables for one get_move call."""
+        # 置換表は探索1回ごとに新しく作る。反復深化の手順は置換表の中身で変わるので、
+        # 持ち越すと同点の手の選び方が過去の探索に左右されてしまう。
+        # APIではCPUを複数のスレッドで使い回すので、表は複製したCPUに持たせる
+        search = copy.copy(self)
+        search._tt = {}
+        search._endgame_tt = {}
+        # 難易度1は盤面を評価しないので、位置の評価値のない大きさの盤でも打てる
+        if self.difficulty > 1:
+            search._use_board_size(board.size)
+        return search
+
+    def _position_grid(self, size: int) -> np.ndarray:
+        """Get the position values of the squares of a board size."""
+        # 8x8より小さい盤では、8x8の表の左上を使う
+        if size > len(self.position_values):
+            raise ValueError(
+                f"Position values only cover boards up to 8x8, not {size}x{size}"
+            )
+        return self.position_values[:size, :size]
+
+    def _use_board_size(self, size: int) -> None:
+        """Set up the position evaluation and move ordering for a board size."""
+        self._size = size
+        tables = self._tables_by_size.get(size)
+        if tables is None:
+            # ビット番号（行 * size + 列）順に並べた、この大きさの盤の位置の評価値
+            values = [int(value) for value in self._position_grid(size).ravel()]
+            # 位置の評価は、ビットボードを1バイトずつ区切って表を引いた値の合計で求める
+            # （表[k][b] = 第kバイトがbのときの評価値）
+            byte_values = tuple(
+                tuple(
+                    sum(value for i, value in enumerate(chunk) if byte >> i & 1)
+                    for byte in range(256)
+                )
+                for chunk in (values[k:k + 8] for k in range(0, len(values), 8))
+            )
+            # 位置の評価値が同じマスをまとめ、値の高い順に並べたビットボード
+            # （角が最初、XマスとCマスが最後になる）
+            classes = tuple(
+                sum(1 << square for square, v in enumerate(values) if v == value)
+                for value in sorted(set(values), reverse=True)
+            )
+            tables = self._tables_by_size[size] = (byte_values, classes)
+        self._pos_byte_values, self._move_classes = tables
     
     def _get_random_move(self, valid_moves: List[Tuple[int, int]]) -> Tuple[int, int]:
         """Get a random valid move."""
-        return random.choice(valid_moves)
+        return valid_moves[self._rng.randrange(len(valid_moves))]
     
     def _get_greedy_move(
         self, board: OthelloBoard, valid_moves: List[Tuple[int, int]]
@@ -181,10 +453,13 @@ class OthelloCPU:
         best_move = valid_moves[0]
         best_score = -1
         
+        state = board.snapshot()
         for move in valid_moves:
-            test_board = board.copy()
-            test_board.make_move(move[0], move[1], self.player)
-            score = self._evaluate_board(test_board)
+            board._play(move[0], move[1], self._own)
+            score = self._evaluate_board(
+                board, board._moves(self._own), board._moves(self._opp)
+            )
+            board.restore(state)
             
             if score > best_score:
                 best_score = score
@@ -192,107 +467,264 @@ class OthelloCPU:
         
         return best_move
     
-    def _get_minimax_move(
-        self, board: OthelloBoard, valid_moves: List[Tuple[int, int]]
-    ) -> Tuple[int, int]:
-        """Get the best move using minimax with alpha-beta pruning."""
-        best_move = valid_moves[0]
-        best_score = float('-inf')
-        
-        for move in valid_moves:
-            test_board = board.copy()
-            test_board.make_move(move[0], move[1], self.player)
-            
-            score = self._minimax(
-                test_board, self.difficulty - 1, float('-inf'), 
-                float('inf'), False
-            )
-            
-            if score > best_score:
-                best_score = score
+    def _get_minimax_move(self, board: OthelloBoard) -> Tuple[int, int]:
+        """Get the best move using iterative deepening minimax."""
+        empties = board.size * board.size - (board.black | board.white).bit_count()
+        if empties <= _ENDGAME_EMPTIES:
+            return self._get_endgame_move(board)
+
+        ordered_moves = self._order_moves(board._moves(self._own), None)
+
+        best_scores = []
+        for depth in range(1, self.difficulty + 1):
+            if len(best_scores) < 2:
+                alpha, beta = float('-inf'), float('inf')
+            else:
+                alpha = best_scores[-2] - _ASPIRATION_WINDOW
+                beta = best_scores[-2] + _ASPIRATION_WINDOW
+            while True:
+                scores = self._search_root(board, ordered_moves, depth, alpha, beta)
+                best_score = max(score for score, _ in scores)
+                # 窓を外れたら、外れた側の境界を外して探索し直す
+                if best_score <= alpha:
+                    alpha = float('-inf')
+                elif best_score >= beta:
+                    beta = float('inf')
+                else:
+                    break
+            best_scores.append(best_score)
+
+            # 次の深さでは評価の高い手から探索する（同点なら前の順番を保つ）
+            scores.sort(key=lambda item: -item[0])
+            ordered_moves = [move for _, move in scores]
+
+        return ordered_moves[0]
+
+    def _search_root(
+        self, board: OthelloBoard, moves: List[Tuple[int, int]], depth: int,
+        alpha: float, beta: float
+    ) -> List[Tuple[float, Tuple[int, int]]]:
+        """Score root moves in order, stopping early if one reaches beta."""
+        scores = []
+        for i, move in enumerate(moves):
+            score = self._search_move(board, move, depth - 1, alpha, beta, 1, i == 0)
+            scores.append((score, move))
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return scores
+
+    def _get_endgame_move(self, board: OthelloBoard) -> Tuple[int, int]:
+        """Get the move with the best final disc difference by searching to the end."""
+        alpha = float('-inf')
+        best_move = None
+        state = board.snapshot()
+        for move in self._order_moves(board._moves(self._own), None):
+            board._play(move[0], move[1], self._own)
+            score = -self._solve(board, float('-inf'), -alpha, -1)
+            board.restore(state)
+            # alpha以下の手の値は上界なので、同点なら先に調べた手を選ぶ
+            if score > alpha:
+                alpha = score
                 best_move = move
-        
         return best_move
+
+    def _order_moves(
+        self, moves: int, best_move: Optional[Tuple[int, int]]
+    ) -> List[Tuple[int, int]]:
+        """Order a move bitboard by position value, trying best_move first."""
+        # 並べ替えずに、評価値の高いマスのまとまりから順にビットを取り出す
+        ordered = []
+        for squares in self._move_classes:
+            if moves & squares:
+                ordered += _squares(moves & squares, self._size)
+        if best_move is not None:
+            ordered.remove(best_move)
+            ordered.insert(0, best_move)
+        return ordered
     
-    def _minimax(
-        self, board: OthelloBoard, depth: int, alpha: float, 
-        beta: float, is_maximizing: bool
+    def _search_move(
+        self, board: OthelloBoard, move: Tuple[int, int], depth: int,
+        alpha: float, beta: float, color: int, first: bool
     ) -> float:
-        """Minimax algorithm with alpha-beta pruning."""
-        if depth == 0 or board.is_game_over():
-            return self._evaluate_board(board)
-        
-        current_player = self.player if is_maximizing else self.opponent
-        valid_moves = board.get_valid_moves(current_player)
+        """Score a move for the side to move (null window unless it is first)."""
+        # 盤面を複製せず、その場で打って探索したあと元に戻す
+        state = board.snapshot()
+        board._play(move[0], move[1], color * self._own)
+        try:
+            if first:
+                return -self._negamax(board, depth, -beta, -alpha, -color)
+
+            # 2手目以降は幅1の窓で調べ、alphaを超えたときだけ窓を広げて探索し直す
+            score = -self._negamax(board, depth, -alpha - 1, -alpha, -color)
+            if alpha < score < beta:
+                score = -self._negamax(board, depth, -beta, -alpha, -color)
+            return score
+        finally:
+            board.restore(state)
+
+    def _negamax(
+        self, board: OthelloBoard, depth: int, alpha: float,
+        beta: float, color: int
+    ) -> float:
+        """Negamax search (color 1 = CPU to move) with PVS and a transposition table."""
+        # 両者の合法手は1回だけ生成し、終局の判定・評価・分岐に使い回す
+        player = color * self._own
+        moves = board._moves(player)
+        replies = board._moves(-player)
+        if depth == 0 or not (moves or replies):
+            if color == 1:
+                return self._evaluate_board(board, moves, replies)
+            return -self._evaluate_board(board, replies, moves)
+
+        key = (board.black, board.white, color)
+        entry = self._tt.get(key)
+        if entry is not None and entry[0] >= depth:
+            _, flag, value, _ = entry
+            if flag == _EXACT:
+                return value
+            if flag == _LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
         
-        if not valid_moves:
+        if not moves:
             # Pass turn to opponent
-            return self._minimax(board, depth - 1, alpha, beta, not is_maximizing)
-        
-        if is_maximizing:
-            max_score = float('-inf')
-            for move in valid_moves:
-                test_board = board.copy()
-                test_board.make_move(move[0], move[1], current_player)
-                score = self._minimax(test_board, depth - 1, alpha, beta, False)
-                max_score = max(max_score, score)
-                alpha = max(alpha, score)
-                if beta <= alpha:
-                    break
-            return max_score
+            return -self._negamax(board, depth - 1, -beta, -alpha, -color)
+
+        # 置換表にある最善手（浅い探索のものでもよい）から先に探索する
+        valid_moves = self._order_moves(
+            moves, entry[3] if entry is not None else None
+        )
+        window = (alpha, beta)
+        best_score = float('-inf')
+        best_move = valid_moves[0]
+        state = board.snapshot()
+        for i, move in enumerate(valid_moves):
+            if depth == 1:
+                # 子は葉なので、再帰せずにその場で打って評価する
+                board._play(move[0], move[1], player)
+                score = color * self._evaluate_board(
+                    board, board._moves(self._own), board._moves(self._opp)
+                )
+                board.restore(state)
+            else:
+                score = self._search_move(
+                    board, move, depth - 1, alpha, beta, color, i == 0
+                )
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        self._store(self._tt, key, depth, best_score, window, best_move)
+        return best_score
+
+    def _solve(
+        self, board: OthelloBoard, alpha: float, beta: float, color: int
+    ) -> float:
+        """Exact negamax of the final disc difference (color 1 = CPU to move)."""
+        key = (board.black, board.white, color)
+        entry = self._endgame_tt.get(key)
+        if entry is not None:
+            # 読み切りの値は深さによらないので、深さは見ない
+            _, flag, value, _ = entry
+            if flag == _EXACT:
+                return value
+            if flag == _LOWER:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if beta <= alpha:
+                return value
+
+        player = color * self._own
+        moves = board._moves(player)
+        if not moves:
+            if not board._moves(-player):
+                # Game over
+                own, opp = board._own_and_opponent(player)
+                return own.bit_count() - opp.bit_count()
+            # Pass turn to opponent
+            return -self._solve(board, -beta, -alpha, -color)
+
+        valid_moves = self._order_moves(
+            moves, entry[3] if entry is not None else None
+        )
+        window = (alpha, beta)
+        best_score = float('-inf')
+        best_move = valid_moves[0]
+        state = board.snapshot()
+        for i, move in enumerate(valid_moves):
+            board._play(move[0], move[1], player)
+            if i == 0:
+                score = -self._solve(board, -beta, -alpha, -color)
+            else:
+                score = -self._solve(board, -alpha - 1, -alpha, -color)
+                if alpha < score < beta:
+                    score = -self._solve(board, -beta, -alpha, -color)
+            board.restore(state)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        self._store(self._endgame_tt, key, 0, best_score, window, best_move)
+        return best_score
+
+    def _store(
+        self, table: _Table, key: Tuple[int, int, int], depth: int, value: float,
+        window: Tuple[float, float], best_move: Tuple[int, int]
+    ) -> None:
+        """Store a search result in a transposition table."""
+        alpha, beta = window
+        if value <= alpha:
+            flag = _UPPER
+        elif value >= beta:
+            flag = _LOWER
         else:
-            min_score = float('inf')
-            for move in valid_moves:
-                test_board = board.copy()
-                test_board.make_move(move[0], move[1], current_player)
-                score = self._minimax(test_board, depth - 1, alpha, beta, True)
-                min_score = min(min_score, score)
-                beta = min(beta, score)
-                if beta <= alpha:
-                    break
-            return min_score
+            flag = _EXACT
+
+        # 一杯になったら作り直す
+        if len(table) >= _TT_MAX_ENTRIES:
+            table.clear()
+        table[key] = (depth, flag, value, best_move)
     
-    def _evaluate_board(self, board: OthelloBoard) -> float:
-        """Evaluate the board position."""
-        if board.is_game_over():
-            black_score, white_score = board.get_score()
-            if self.player == Player.BLACK:
-                if black_score > white_score:
-                    return 1000
-                elif black_score < white_score:
-                    return -1000
-                else:
-                    return 0
+    def _evaluate_board(
+        self, board: OthelloBoard, cpu_moves: int, opponent_moves: int
+    ) -> float:
+        """Evaluate the board position given both players' move bitboards."""
+        own, opp = board._own_and_opponent(self._own)
+        piece_diff = own.bit_count() - opp.bit_count()
+        if not (cpu_moves or opponent_moves):
+            # Game over
+            if piece_diff > 0:
+                return 1000
+            elif piece_diff < 0:
+                return -1000
             else:
-                if white_score > black_score:
-                    return 1000
-                elif white_score < black_score:
-                    return -1000
-                else:
-                    return 0
+                return 0
         
         # Combine multiple heuristics
         score = 0.0
         
         # Piece difference
-        black_score, white_score = board.get_score()
-        piece_diff = (black_score - white_score) * (1 if self.player == Player.BLACK else -1)
         score += piece_diff * 10
         
         # Position values
-        position_score = 0
-        for row in range(board.size):
-            for col in range(board.size):
-                if board.board[row, col] == self.player.value:
-                    position_score += self.position_values[row, col]
-                elif board.board[row, col] == self.opponent.value:
-                    position_score -= self.position_values[row, col]
-        score += position_score
+        for values in self._pos_byte_values:
+            score += values[own & 0xFF] - values[opp & 0xFF]
+            own >>= 8
+            opp >>= 8
         
         # Mobility (number of valid moves)
-        cpu_moves = len(board.get_valid_moves(self.player))
-        opponent_moves = len(board.get_valid_moves(self.opponent))
-        score += (cpu_moves - opponent_moves) * 5
+        score += (cpu_moves.bit_count() - opponent_moves.bit_count()) * 5
         
         return score
 
@@ -305,7 +737,9 @@ class OthelloGame:
         human_player: Player = Player.BLACK
     ) -> None:
         """Initialize the game."""
-        self.board = OthelloBoard(board_size)
+        self.board = (
+            OthelloBoard8() if board_size == 8 else OthelloBoard(board_size)
+        )
         self.human_player = human_player
         self.cpu_player = Player.WHITE if human_player == Player.BLACK else Player.BLACK
         self.cpu = OthelloCPU(self.cpu_player, cpu_difficulty)
@@ -0,0 +1,154 @@
+"""
+Numba kernels for 8x8 Othello bitboards.
+
+Bit n of a bitboard is square (n // 8, n % 8).
+"""
+
+from numba import njit, uint64
+import numpy as np
+
+# 左シフトで第1列へ、右シフトで第8列へ回り込んだビットを消すマスク
+_NOT_FIRST_COL = np.uint64(0xFEFEFEFEFEFEFEFE)
+_NOT_LAST_COL = np.uint64(0x7F7F7F7F7F7F7F7F)
+_FULL = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+@njit(uint64(uint64, uint64, uint64, uint64), cache=True)
+def _left_moves(own: int, opp: int, shift: int, mask: int) -> int:
+    """Get the moves of own along one left-shifting direction."""
+    line = opp & mask
+    x = (own << shift) & line
+    x |= (x << shift) & line
+    x |= (x << shift) & line
+    x |= (x << shift) & line
+    x |= (x << shift) & line
+    x |= (x << shift) & line
+    return (x << shift) & mask
+
+
+@njit(uint64(uint64, uint64, uint64, uint64), cache=True)
+def _right_moves(own: int, opp: int, shift: int, mask: int) -> int:
+    """Get the moves of own along one right-shifting direction."""
+    line = opp & mask
+    x = (own >> shift) & line
+    x |= (x >> shift) & line
+    x |= (x >> shift) & line
+    x |= (x >> shift) & line
+    x |= (x >> shift) & line
+    x |= (x >> shift) & line
+    return (x >> shift) & mask
+
+
+@njit(uint64(uint64, uint64), cache=True)
+def legal_moves(own: int, opp: int) -> int:
+    """Get the bitboard of legal moves for own against opp."""
+    moves = (
+        _left_moves(own, opp, 1, _NOT_FIRST_COL)
+        | _right_moves(own, opp, 1, _NOT_LAST_COL)
+        | _left_moves(own, opp, 8, _FULL)
+        | _right_moves(own, opp, 8, _FULL)
+        | _left_moves(own, opp, 9, _NOT_FIRST_COL)
+        | _left_moves(own, opp, 7, _NOT_LAST_COL)
+        | _right_moves(own, opp, 7, _NOT_FIRST_COL)
+        | _right_moves(own, opp, 9, _NOT_LAST_COL)
+    )
+    return moves & ~(own | opp)
+
+
+def _build_line_flips() -> np.ndarray:
+    """Build the flips of a move on one 8-square line, by position and pattern."""
+    # 表[位置, 自分の石の並び, 相手の石の並び] = 返る石の並び
+    own = np.arange(256)[:, None]
+    opp = np.arange(256)[None, :]
+    table = np.zeros((8, 256, 256), dtype=np.int64)
+    for pos in range(8):
+        for step in (1, -1):
+            scanning = np.ones((256, 256), dtype=bool)
+            run = np.zeros((256, 256), dtype=np.int64)
+            k = pos + step
+            while 0 <= k < 8:
+                own_here = (own & (1 << k)) != 0
+                opp_here = ((opp & (1 << k)) != 0) & ~own_here
+                # 自分の石に当たったら、そこまでに並んだ相手の石が返る
+                table[pos] |= np.where(scanning & own_here, run, 0)
+                scanning &= opp_here
+                run |= np.where(scanning, 1 << k, 0)
+                k += step
+    return table.astype(np.uint8)
+
+
+def _build_line_expansions() -> np.ndarray:
+    """Build the bitboards of 8-bit line patterns for each line through a square."""
+    # 表[向き, マス, 並び] = 並びを盤面に戻したビットボード。向きは列・斜め・逆斜め
+    # （行は並びをシフトするだけで戻せる）。並びのビットkは、列では行kのマス、
+    # 斜めでは列kのマスを表す
+    patterns = (np.arange(256)[:, None] >> np.arange(8)) & 1
+    table = np.zeros((3, 64, 256), dtype=np.uint64)
+    for square in range(64):
+        row, col = divmod(square, 8)
+        diagonal, anti_diagonal = row - col, row + col
+        lines = [
+            [k * 8 + col for k in range(8)],
+            [(diagonal + k) * 8 + k if 0 <= diagonal + k < 8 else -1 for k in range(8)],
+            [(anti_diagonal - k) * 8 + k if 0 <= anti_diagonal - k < 8 else -1
+             for k in range(8)],
+        ]
+        for orientation, squares in enumerate(lines):
+            bits = np.array(
+                [1 << sq if sq >= 0 else 0 for sq in squares], dtype=np.uint64
+            )
+            table[orientation, square] = (patterns.astype(np.uint64) * bits).sum(axis=1)
+    return table
+
+
+def _build_diagonal_masks() -> np.ndarray:
+    """Build the masks of the diagonal and anti-diagonal through each square."""
+    masks = np.zeros((2, 64), dtype=np.uint64)
+    for square in range(64):
+        row, col = divmod(square, 8)
+        for other in range(64):
+            r, c = divmod(other, 8)
+            if r - c == row - col:
+                masks[0, square] |= np.uint64(1 << other)
+            if r + c == row + col:
+                masks[1, square] |= np.uint64(1 << other)
+    return masks
+
+
+_LINE_FLIPS = _build_line_flips()
+_LINE_EXPANSIONS = _build_line_expansions()
+_DIAGONAL_MASKS = _build_diagonal_masks()
+
+# 第1列の全マスと、列・斜めの石を最上位バイトへ集めるための乗数
+# （列は行 r がビット r へ、斜めは列 c がビット c へ集まる）
+_FIRST_COL = np.uint64(0x0101010101010101)
+_COLLECT_RANKS = np.uint64(0x0102040810204080)
+_COLLECT_FILES = np.uint64(0x0101010101010101)
+
+
+@njit(uint64(uint64, uint64, uint64), cache=True)
+def flips(square: int, own: int, opp: int) -> int:
+    """Get the bitboard of opp pieces flipped by placing own on square."""
+    row = square >> 3
+    col = square & 7
+
+    # 行: 8ビットを取り出して表を引き、同じだけシフトして戻す
+    line_own = (own >> (row * 8)) & 0xFF
+    line_opp = (opp >> (row * 8)) & 0xFF
+    result = uint64(_LINE_FLIPS[col, line_own, line_opp]) << (row * 8)
+
+    # 列
+    line_own = (((own >> col) & _FIRST_COL) * _COLLECT_RANKS) >> 56
+    line_opp = (((opp >> col) & _FIRST_COL) * _COLLECT_RANKS) >> 56
+    result |= _LINE_EXPANSIONS[0, square, _LINE_FLIPS[row, line_own, line_opp]]
+
+    # 斜めと逆斜め
+    for orientation in range(2):
+        mask = _DIAGONAL_MASKS[orientation, square]
+        line_own = ((own & mask) * _COLLECT_FILES) >> 56
+        line_opp = ((opp & mask) * _COLLECT_FILES) >> 56
+        result |= _LINE_EXPANSIONS[
+            orientation + 1, square, _LINE_FLIPS[col, line_own, line_opp]
+        ]
+
+    return result
@@ -2,11 +2,76 @@
 FastAPI main application.
 """
 
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+import uvicorn
+from app.api.responses import ORJSONResponse
+from app.api.routes import build_opening_book, router
+from app.game.othello import warm_up
 
-app = FastAPI(title="Othello Game API", version="1.0.0")
+
+def worker_count() -> int:
+    """Return the number of uvicorn workers serving the app."""
+    # ワーカーが1つなら、uvicornはアプリを自分のプロセスで動かす
+    if multiprocessing.parent_process() is None:
+        return 1
+    # 複数のワーカーは親のコマンドライン（sys.argv）を引き継いで起動されるので、
+    # uvicornと同じく --workers、なければ WEB_CONCURRENCY を読む
+    params = uvicorn.main.make_context(
+        "uvicorn", sys.argv[1:], resilient_parsing=True
+    ).params
+    if params.get("reload"):
+        return 1
+    workers = params.get("workers") or os.environ.get("WEB_CONCURRENCY", 1)
+    return max(1, int(workers))
+
+
+def run(import_string: str) -> None:
+    """Serve the app found at an import string with uvicorn."""
+    # 既定では1つのワーカーがコア数分の探索プロセスを使う
+    # （WEB_CONCURRENCY でワーカーを増やすと、コアをワーカーで分け合う）
+    # ワーカーを複数起動するにはアプリをインポート文字列で渡す必要がある
+    uvicorn.run(
+        import_string,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Prepare the game engine, the opening book and the CPU search pool."""
+    # Numbaのコンパイルを最初のリクエストで待たせない
+    warm_up()
+    build_opening_book()
+    # CPUの探索は子プロセスで並列に行う（子プロセスもNumbaのディスクキャッシュを読む）
+    # コアはワーカー全体で分け合うので、ワーカーごとのプロセス数は コア数 // ワーカー数
+    pool = ProcessPoolExecutor(
+        max_workers=max(1, (os.cpu_count() or 1) // worker_count()),
+        initializer=warm_up,
+    )
+    app.state.cpu_pool = pool
+    try:
+        yield
+    finally:
+        del app.state.cpu_pool
+        pool.shutdown(cancel_futures=True)
+
+
+app = FastAPI(
+    title="Othello Game API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
 
 # CORS設定（Reactからのアクセスを許可）
 app.add_middleware(
@@ -34,5 +99,4 @@ async def root():
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    run("app.main:app")
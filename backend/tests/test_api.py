@@ -0,0 +1,395 @@
+"""
+Test cases for the Othello game API.
+"""
+
+from typing import Iterator
+from fastapi.testclient import TestClient
+from app.api.models import BoardState, CPUMoveResponse
+from app.api.responses import ResponseCache
+from app.api.routes import (
+    _opening_book, board_to_str, moves_to_str, str_to_board, str_to_moves
+)
+from app.game.othello import OthelloBoard, OthelloCPU, Player
+from app.main import app, worker_count
+import multiprocessing
+import os
+import sys
+import pytest
+import numpy as np
+
+# Black on (3, 4) and (4, 3), white on (3, 3) and (4, 4)
+INITIAL_BOARD = "0000000810000000" + "0000001008000000"
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Create a test client for the API with its lifespan running."""
+    with TestClient(app) as client:
+        yield client
+
+
+class TestGameAPI:
+    """Test cases for the game endpoints."""
+
+    def test_new_game(self, client: TestClient) -> None:
+        """Test starting a new game."""
+        response = client.get("/api/game/new")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["board"] == INITIAL_BOARD
+        assert data["current_player"] == 1
+        assert data["black_score"] == 2
+        assert data["white_score"] == 2
+        assert data["game_over"] is False
+        assert data["winner"] is None
+        assert sorted(str_to_moves(data["valid_moves"])) == [
+            (2, 3), (3, 2), (4, 5), (5, 4)
+        ]
+
+    def test_make_move(self, client: TestClient) -> None:
+        """Test making a move through the API."""
+        response = client.post(
+            "/api/game/move",
+            json={"board": INITIAL_BOARD, "row": 2, "col": 3, "player": 1},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        board = str_to_board(data["board"])
+        assert board.board[2, 3] == 1
+        assert board.board[3, 3] == 1  # Flipped piece
+        assert data["current_player"] == -1
+        assert data["black_score"] == 4
+        assert data["white_score"] == 1
+        assert len(str_to_moves(data["valid_moves"])) > 0
+
+    def test_move_ending_game(self, client: TestClient) -> None:
+        """Test that a move filling the board ends the game."""
+        black = ((1 << 64) - 1) & ~0b110
+        response = client.post(
+            "/api/game/move",
+            json={"board": f"{black:016x}{0b10:016x}", "row": 0, "col": 2, "player": 1},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data["game_over"] is True
+        assert data["winner"] == 1
+        assert data["valid_moves"] == "0" * 16
+
+    def test_cpu_move(self, client: TestClient) -> None:
+        """Test getting a CPU move through the API."""
+        response = client.post(
+            "/api/game/cpu-move",
+            json={"board": INITIAL_BOARD, "player": 1, "difficulty": 2},
+        )
+        assert response.status_code == 200
+
+        data = response.json()
+        assert tuple(data["move"]) in [(2, 3), (3, 2), (4, 5), (5, 4)]
+        assert data["black_score"] == 4
+        assert data["white_score"] == 1
+
+    def test_cpu_move_by_query(self, client: TestClient) -> None:
+        """Test that the GET CPU move endpoint matches the POST one."""
+        response = client.get(
+            "/api/game/cpu-move", params={"b": INITIAL_BOARD, "p": 1, "d": 3}
+        )
+        assert response.status_code == 200
+        assert response.headers["cache-control"].startswith("public")
+
+        posted = client.post(
+            "/api/game/cpu-move",
+            json={"board": INITIAL_BOARD, "player": 1, "difficulty": 3},
+        )
+        assert response.json() == posted.json()
+
+    def test_cpu_move_without_pool(self) -> None:
+        """Test that CPU moves fall back to threads without the lifespan pool."""
+        response = TestClient(app).get(
+            "/api/game/cpu-move", params={"b": INITIAL_BOARD, "p": -1, "d": 2}
+        )
+        assert response.status_code == 200
+        assert tuple(response.json()["move"]) in [(2, 4), (3, 5), (4, 2), (5, 3)]
+
+    @pytest.mark.parametrize("spawned, argv, workers", [
+        (False, ["uvicorn", "app.main:app", "--workers", "3"], 1),
+        (True, ["uvicorn", "app.main:app", "--workers", "3"], 3),
+        (True, ["uvicorn", "app.main:app", "--workers=4"], 4),
+        (True, ["uvicorn", "app.main:app"], 2),
+        (True, ["app/main.py"], 2),
+        (True, ["uvicorn", "app.main:app", "--reload"], 1),
+    ])
+    def test_worker_count(
+        self,
+        monkeypatch: pytest.MonkeyPatch,
+        spawned: bool,
+        argv: list[str],
+        workers: int,
+    ) -> None:
+        """Test that the worker count follows uvicorn's own settings."""
+        parent = object() if spawned else None
+        monkeypatch.setattr(multiprocessing, "parent_process", lambda: parent)
+        monkeypatch.setattr(sys, "argv", argv)
+        monkeypatch.setenv("WEB_CONCURRENCY", "2")
+        assert worker_count() == workers
+
+    def test_cpu_pool_split_between_workers(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that each server worker gets its share of the CPU cores."""
+        monkeypatch.setattr(os, "cpu_count", lambda: 8)
+        with TestClient(app):
+            assert app.state.cpu_pool._max_workers == 8
+        monkeypatch.setattr(multiprocessing, "parent_process", lambda: object())
+        monkeypatch.setattr(sys, "argv", ["uvicorn", "app.main:app", "--workers", "3"])
+        with TestClient(app):
+            assert app.state.cpu_pool._max_workers == 2
+        monkeypatch.setattr(sys, "argv", ["uvicorn", "app.main:app", "--workers", "17"])
+        with TestClient(app):
+            assert app.state.cpu_pool._max_workers == 1
+
+    def test_opening_book(self, client: TestClient) -> None:
+        """Test that opening book moves match a fresh search."""
+        assert len(_opening_book) == 8
+        for player in (1, -1):
+            response = client.get(
+                "/api/game/cpu-move",
+                params={"b": INITIAL_BOARD.upper(), "p": player, "d": 5},
+            )
+            assert response.status_code == 200
+            expected = OthelloCPU(Player(player), 5).get_move(OthelloBoard())
+            assert tuple(response.json()["move"]) == expected
+
+    def test_random_cpu_move_not_cacheable(self, client: TestClient) -> None:
+        """Test that random CPU moves are not marked cacheable."""
+        response = client.get(
+            "/api/game/cpu-move", params={"b": INITIAL_BOARD, "p": 1, "d": 1}
+        )
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == "no-store"
+
+    def test_repeated_cpu_move(self, client: TestClient) -> None:
+        """Test that repeated CPU move requests get the same answer."""
+        request = {"board": INITIAL_BOARD, "player": 1, "difficulty": 3}
+        first = client.post("/api/game/cpu-move", json=request)
+        second = client.post("/api/game/cpu-move", json=request)
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json()
+
+    def test_valid_moves(self, client: TestClient) -> None:
+        """Test getting valid moves for the current game."""
+        client.get("/api/game/new")
+        response = client.get("/api/game/valid-moves/-1")
+        assert response.status_code == 200
+        assert sorted(str_to_moves(response.json()["valid_moves"])) == [
+            (2, 4), (3, 5), (4, 2), (5, 3)
+        ]
+
+    def test_valid_moves_with_board_state(self, client: TestClient) -> None:
+        """Test getting valid moves for a given board state."""
+        response = client.get(
+            "/api/game/valid-moves/1", params={"board_state": INITIAL_BOARD}
+        )
+        assert response.status_code == 200
+        assert sorted(str_to_moves(response.json()["valid_moves"])) == [
+            (2, 3), (3, 2), (4, 5), (5, 4)
+        ]
+
+    def test_malformed_board(self, client: TestClient) -> None:
+        """Test that malformed boards are rejected."""
+        for board in ["0" * 31, "0" * 34, "g" * 32, "0x" + "0" * 30, "f" * 32]:
+            response = client.post(
+                "/api/game/cpu-move",
+                json={"board": board, "player": 1, "difficulty": 2},
+            )
+            assert response.status_code == 400
+
+    def test_board_with_whitespace(self, client: TestClient) -> None:
+        """Test that boards padded or split with whitespace are rejected."""
+        boards = [
+            " " + INITIAL_BOARD,
+            INITIAL_BOARD[:16] + " " + INITIAL_BOARD[16:],
+            "00 " * 16,
+        ]
+        for board in boards:
+            responses = [
+                client.get(
+                    "/api/game/cpu-move", params={"b": board, "p": 1, "d": 2}
+                ),
+                client.post(
+                    "/api/game/cpu-move",
+                    json={"board": board, "player": 1, "difficulty": 2},
+                ),
+                client.get(
+                    "/api/game/valid-moves/1", params={"board_state": board}
+                ),
+            ]
+            assert [response.status_code for response in responses] == [400] * 3
+
+    def test_upper_case_board(self, client: TestClient) -> None:
+        """Test that upper-case boards are answered like lower-case ones."""
+        board = "0000000c18100000" + "0000240000000000"
+        expected = client.get(
+            "/api/game/cpu-move", params={"b": board.lower(), "p": -1, "d": 2}
+        ).json()
+        response = client.get(
+            "/api/game/cpu-move", params={"b": board.upper(), "p": -1, "d": 2}
+        )
+        assert response.json() == expected
+        assert client.get(
+            "/api/game/cpu-move", params={"b": INITIAL_BOARD.upper(), "p": 1, "d": 5}
+        ).json()["move"] == list(_opening_book[1, 5])
+
+    def test_empty_player_rejected(self, client: TestClient) -> None:
+        """Test that player values other than black or white are rejected."""
+        for player in (0, 2):
+            responses = [
+                client.get(
+                    "/api/game/cpu-move",
+                    params={"b": INITIAL_BOARD, "p": player, "d": 2},
+                ),
+                client.post(
+                    "/api/game/cpu-move",
+                    json={"board": INITIAL_BOARD, "player": player, "difficulty": 2},
+                ),
+                client.post(
+                    "/api/game/move",
+                    json={"board": INITIAL_BOARD, "row": 2, "col": 3, "player": player},
+                ),
+                client.get(f"/api/game/valid-moves/{player}"),
+            ]
+            assert [response.status_code for response in responses] == [400] * 4
+
+    def test_difficulty_clamped(self, client: TestClient) -> None:
+        """Test that out-of-range difficulties are searched at 1 to 5."""
+        board = "0000001818100000" + "0000240000000000"
+        expected = client.get(
+            "/api/game/cpu-move", params={"b": board, "p": -1, "d": 5}
+        ).json()
+        response = client.get(
+            "/api/game/cpu-move", params={"b": board, "p": -1, "d": 99}
+        )
+        assert response.json() == expected
+        posted = client.post(
+            "/api/game/cpu-move",
+            json={"board": board, "player": -1, "difficulty": 99},
+        )
+        assert posted.json() == expected
+
+        response = client.get(
+            "/api/game/cpu-move", params={"b": board, "p": -1, "d": -3}
+        )
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-store"
+
+
+class TestRequestBodies:
+    """Test cases for request bodies parsed by the handlers themselves."""
+
+    @pytest.mark.parametrize("body", [
+        b"not json",
+        b"[]",
+        b'{"board": "%s", "row": "2", "col": 3, "player": 1}' % INITIAL_BOARD.encode(),
+        b'{"board": "%s", "row": 2, "col": 3, "player": true}' % INITIAL_BOARD.encode(),
+        b'{"board": "%s", "row": 2, "col": 3}' % INITIAL_BOARD.encode(),
+    ])
+    def test_malformed_move_request(self, client: TestClient, body: bytes) -> None:
+        """Test that malformed move requests are rejected."""
+        response = client.post(
+            "/api/game/move",
+            content=body,
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 400
+
+    def test_openapi_documents_request_bodies(self, client: TestClient) -> None:
+        """Test that the OpenAPI schema still describes the request bodies."""
+        paths = client.get("/openapi.json").json()["paths"]
+        for path, model in [
+            ("/api/game/move", "MoveRequest"),
+            ("/api/game/cpu-move", "CPUMoveRequest"),
+        ]:
+            body = paths[path]["post"]["requestBody"]
+            schema = body["content"]["application/json"]["schema"]
+            assert schema["title"] == model
+
+
+class TestWireFormat:
+    """Test cases for the bitboard wire format."""
+
+    def test_board_round_trip(self) -> None:
+        """Test that a board survives the wire representation."""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            cells = rng.integers(-1, 2, size=(8, 8)).astype(np.int8)
+            board = OthelloBoard()
+            board.board = cells
+            assert np.array_equal(str_to_board(board_to_str(board)).board, cells)
+
+    def test_edited_board_to_str(self) -> None:
+        """Test that edits through the cell grid reach the wire string."""
+        board = str_to_board(INITIAL_BOARD)
+        board.board[0, 0] = Player.BLACK.value
+        assert board_to_str(board) == "0000000810000001" + "0000001008000000"
+
+    def test_square_numbering(self) -> None:
+        """Test that bit n of a bitboard is square (n // 8, n % 8)."""
+        cells = str_to_board(f"{1 << (2 * 8 + 5):016x}{1 << 63:016x}").board
+        assert cells[2, 5] == 1
+        assert cells[7, 7] == -1
+        assert np.count_nonzero(cells) == 2
+
+    def test_moves_round_trip(self) -> None:
+        """Test that moves survive the wire bitmask in square order."""
+        moves = [(0, 0), (2, 3), (5, 4), (7, 7)]
+        assert moves_to_str(moves) == "8000100000080001"
+        assert str_to_moves(moves_to_str(moves)) == moves
+        assert moves_to_str([]) == "0" * 16
+
+
+class TestResponseCache:
+    """Test cases for the response body cache."""
+
+    def test_evicts_least_recently_used(self) -> None:
+        """Test that the least recently used body is evicted first."""
+        cache = ResponseCache(maxsize=2)
+        cache.put(b"a", b"1")
+        cache.put(b"b", b"2")
+        assert cache.get(b"a") == b"1"
+
+        cache.put(b"c", b"3")
+        assert cache.get(b"b") is None
+        assert cache.get(b"a") == b"1"
+        assert cache.get(b"c") == b"3"
+
+
+class TestResponseSchemas:
+    """Responses skip runtime validation, so check them against the models."""
+
+    def test_board_state_schema(self, client: TestClient) -> None:
+        """Test that board state responses conform to BoardState."""
+        BoardState.model_validate_json(client.get("/api/game/new").content)
+        response = client.post(
+            "/api/game/move",
+            json={"board": INITIAL_BOARD, "row": 2, "col": 3, "player": 1},
+        )
+        BoardState.model_validate_json(response.content)
+
+    def test_cpu_move_response_schema(self, client: TestClient) -> None:
+        """Test that CPU move responses conform to CPUMoveResponse."""
+        response = client.post(
+            "/api/game/cpu-move",
+            json={"board": INITIAL_BOARD, "player": 1, "difficulty": 3},
+        )
+        CPUMoveResponse.model_validate_json(response.content)
+
+        # A board with no empty squares has no moves for the CPU
+        response = client.post(
+            "/api/game/cpu-move",
+            json={"board": "0" * 16 + "f" * 16, "player": 1, "difficulty": 3},
+        )
+        data = CPUMoveResponse.model_validate_json(response.content)
+        assert data.move is None
+        assert data.white_score == 64
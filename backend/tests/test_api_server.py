@@ -0,0 +1,45 @@
+"""
+Smoke tests for the standalone API server at the repository root.
+"""
+
+from typing import Iterator
+from fastapi.testclient import TestClient
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+import api_server  # noqa: E402
+
+# Black on (3, 4) and (4, 3), white on (3, 3) and (4, 4)
+INITIAL_BOARD = "0000000810000000" + "0000001008000000"
+
+
+@pytest.fixture
+def client() -> Iterator[TestClient]:
+    """Create a test client for the server with its lifespan running."""
+    with TestClient(api_server.app) as client:
+        yield client
+
+
+class TestAPIServer:
+    """Test cases for the standalone server."""
+
+    def test_root(self, client: TestClient) -> None:
+        """Test the root endpoint."""
+        response = client.get("/")
+        assert response.status_code == 200
+
+    def test_new_game(self, client: TestClient) -> None:
+        """Test starting a new game."""
+        response = client.get("/api/game/new")
+        assert response.status_code == 200
+        assert response.json()["board"] == INITIAL_BOARD
+
+    def test_cpu_move(self, client: TestClient) -> None:
+        """Test getting a CPU move from the backend engine."""
+        response = client.get(
+            "/api/game/cpu-move", params={"b": INITIAL_BOARD, "p": -1, "d": 2}
+        )
+        assert response.status_code == 200
+        assert response.json()["move"] in ([2, 4], [3, 5], [4, 2], [5, 3])
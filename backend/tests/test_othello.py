@@ -2,7 +2,11 @@
 Test cases for Othello game implementation.
 """
 
-from app.game.othello import OthelloBoard, Player, OthelloCPU, OthelloGame
+from app.game import othello
+from app.game.othello import (
+    OthelloBoard, OthelloBoard8, Player, OthelloCPU, OthelloGame
+)
+from concurrent.futures import ThreadPoolExecutor
 import pytest
 import numpy as np
 import sys
@@ -91,6 +95,37 @@ class TestOthelloBoard:
                 len(board.get_valid_moves(Player.WHITE)) == 0):
             assert board.is_game_over()
 
+    def test_no_wrap_around_edges(self) -> None:
+        """Test that lines do not wrap from one row edge to the next."""
+        board = OthelloBoard(8)
+        board.board.fill(Player.EMPTY.value)
+        board.board[0, 7] = Player.BLACK.value
+        board.board[1, 0] = Player.WHITE.value
+
+        # (1, 1) -> (1, 0) -> (0, 7) is a straight line only in bit order
+        assert not board.is_valid_move(1, 1, Player.BLACK)
+        assert board.get_valid_moves(Player.BLACK) == []
+
+    def test_other_board_sizes(self) -> None:
+        """Test moves on boards larger than 8x8."""
+        board = OthelloBoard(10)
+        assert board.get_valid_moves(Player.BLACK) == [(3, 4), (4, 3), (5, 6), (6, 5)]
+
+        assert board.make_move(3, 4, Player.BLACK)
+        assert board.board[4, 4] == Player.BLACK.value
+        assert board.get_score() == (4, 1)
+
+    def test_board_string(self) -> None:
+        """Test the string representation of the board."""
+        board = OthelloBoard(4)
+        assert str(board) == (
+            "  0 1 2 3\n"
+            "0 . . . .\n"
+            "1 . W B .\n"
+            "2 . B W .\n"
+            "3 . . . .\n"
+        )
+
     def test_board_copy(self) -> None:
         """Test board copying."""
         board = OthelloBoard(8)
@@ -104,6 +139,44 @@ class TestOthelloBoard:
         copy_board.make_move(2, 4, Player.WHITE)
         assert not np.array_equal(board.board, copy_board.board)
 
+    def test_bitboards_follow_cell_edits(self) -> None:
+        """Test that the bitboards and the cell grid never disagree."""
+        board = OthelloBoard(8)
+        str(board)
+        board.black, board.white = 1, 2
+        assert board.get_score() == (1, 1)
+        assert board.board[0, 0] == Player.BLACK.value
+
+        cells = board.board
+        cells[7, 7] = Player.WHITE.value
+        assert board.white == 2 | 1 << 63
+
+        # The grid is replaced once the edits are applied
+        with pytest.raises(ValueError):
+            cells[7, 6] = Player.WHITE.value
+        assert board.board[7, 6] == Player.EMPTY.value
+
+    def test_board8_matches_generic_board(self) -> None:
+        """Test that the 8x8 board plays random games like the generic board."""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            board, generic = OthelloBoard8(), OthelloBoard(8)
+            player = Player.BLACK
+            while not generic.is_game_over():
+                moves = generic.get_valid_moves(player)
+                assert board.get_valid_moves(player) == moves
+                if moves:
+                    row, col = moves[rng.integers(len(moves))]
+                    assert board.make_move(row, col, player)
+                    generic.make_move(row, col, player)
+                    assert board.snapshot() == generic.snapshot()
+                player = Player.WHITE if player == Player.BLACK else Player.BLACK
+            assert board.is_game_over()
+
+        copy_board = board.copy()
+        assert type(copy_board) is OthelloBoard8
+        assert copy_board.snapshot() == board.snapshot()
+
 
 class TestOthelloCPU:
     """Test cases for OthelloCPU class."""
@@ -144,6 +217,112 @@ class TestOthelloCPU:
             if move is not None:
                 assert board.is_valid_move(move[0], move[1], Player.BLACK)
 
+    def test_search_tables_per_call(self) -> None:
+        """Test that each search uses its own tables, even across threads."""
+        board = OthelloBoard(8)
+        board.make_move(2, 3, Player.BLACK)
+        cpu = OthelloCPU(Player.WHITE, difficulty=4)
+
+        move = cpu.get_move(board)
+        assert not cpu._tt
+        assert cpu.get_move(board) == move
+        assert OthelloCPU(Player.WHITE, difficulty=4).get_move(board) == move
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            moves = list(pool.map(lambda _: cpu.get_move(board.copy()), range(8)))
+        assert moves == [move] * 8
+
+    def test_move_ordering(self) -> None:
+        """Test that the table's best move comes first, then corners."""
+        cpu = OthelloCPU(Player.BLACK, difficulty=3)
+        squares = [(1, 1), (2, 3), (7, 7), (0, 2)]
+        moves = sum(1 << (row * 8 + col) for row, col in squares)
+        assert cpu._order_moves(moves, None) == [(7, 7), (0, 2), (2, 3), (1, 1)]
+        assert cpu._order_moves(moves, (2, 3))[0] == (2, 3)
+
+        # C squares come after interior squares, and X squares last
+        moves = (1 << 1) | (1 << 9) | (1 << 27)
+        assert cpu._order_moves(moves, None) == [(3, 3), (0, 1), (1, 1)]
+
+    def test_other_board_sizes(self) -> None:
+        """Test that CPU moves are valid on boards other than 8x8."""
+        for difficulty in [2, 3, 4]:
+            game = OthelloGame(board_size=6, cpu_difficulty=difficulty)
+            cpus = {
+                Player.BLACK: OthelloCPU(Player.BLACK, difficulty),
+                Player.WHITE: game.cpu,
+            }
+            player = Player.BLACK
+            while not game.board.is_game_over():
+                move = cpus[player].get_move(game.board)
+                if move is not None:
+                    assert move in game.board.get_valid_moves(player)
+                    assert game.board.make_move(move[0], move[1], player)
+                player = Player.WHITE if player == Player.BLACK else Player.BLACK
+
+        # Position values only cover boards up to 8x8
+        board = OthelloBoard(10)
+        row, col = OthelloCPU(Player.BLACK, 1).get_move(board)
+        assert board.is_valid_move(row, col, Player.BLACK)
+        with pytest.raises(ValueError):
+            OthelloCPU(Player.BLACK, 3).get_move(board)
+
+    def test_position_values_other_sizes(self) -> None:
+        """Test that smaller boards score each (row, col) like the 8x8 table."""
+        cpu = OthelloCPU(Player.BLACK, difficulty=2)
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            board = OthelloBoard(6)
+            board.board = rng.integers(-1, 2, size=(6, 6)).astype(np.int8)
+            cells = board.board
+            search = cpu._for_search(board)
+            # Without moves for either side the game is over, so give both a move
+            score = search._evaluate_board(board, 1, 1)
+            piece_diff = int(cells.sum())
+            position_score = int((cells * cpu.position_values[:6, :6]).sum())
+            assert score == piece_diff * 10 + position_score
+
+    def test_aspiration_window_re_search(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that windows failing high or low still find the full-window move."""
+        board = OthelloBoard8()
+        for row, col, player in [(2, 3, Player.BLACK), (2, 2, Player.WHITE)]:
+            board.make_move(row, col, player)
+
+        expected = OthelloCPU(Player.BLACK, difficulty=5).get_move(board)
+        monkeypatch.setattr(othello, "_ASPIRATION_WINDOW", 1)
+        assert OthelloCPU(Player.BLACK, difficulty=5).get_move(board) == expected
+
+    def test_endgame_solver(self) -> None:
+        """Test that the endgame move has the best final disc difference."""
+        def final_diff(board: OthelloBoard, player: Player) -> int:
+            """Get the final disc difference for player by plain minimax."""
+            opponent = Player.WHITE if player == Player.BLACK else Player.BLACK
+            moves = board.get_valid_moves(player)
+            if not moves:
+                if board.is_game_over():
+                    black, white = board.get_score()
+                    return (black - white) * player.value
+                return -final_diff(board, opponent)
+            scores = []
+            for row, col in moves:
+                child = board.copy()
+                child.make_move(row, col, player)
+                scores.append(-final_diff(child, opponent))
+            return max(scores)
+
+        rng = np.random.default_rng(0)
+        board, player = OthelloBoard8(), Player.BLACK
+        while 64 - sum(board.get_score()) > 7 or not board.get_valid_moves(player):
+            moves = board.get_valid_moves(player)
+            if moves:
+                board.make_move(*moves[rng.integers(len(moves))], player)
+            player = Player.WHITE if player == Player.BLACK else Player.BLACK
+
+        move = OthelloCPU(player, difficulty=3).get_move(board)
+        opponent = Player.WHITE if player == Player.BLACK else Player.BLACK
+        child = board.copy()
+        child.make_move(move[0], move[1], player)
+        assert -final_diff(child, opponent) == final_diff(board, player)
+
     def test_evaluation_function(self) -> None:
         """Test that CPU can evaluate board positions."""
         board = OthelloBoard(8)
@@ -164,6 +343,8 @@ class TestOthelloGame:
                            human_player=Player.BLACK)
 
         assert game.board.size == 8
+        assert isinstance(game.board, OthelloBoard8)
+        assert type(OthelloGame(board_size=6).board) is OthelloBoard
         assert game.human_player == Player.BLACK
         assert game.cpu_player == Player.WHITE
         assert game.current_player == Player.BLACK
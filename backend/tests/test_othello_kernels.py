@@ -0,0 +1,48 @@
+"""
+Test cases for the Numba bitboard kernels.
+"""
+
+from app.game import othello_kernels
+from app.game.othello import _flips, _legal_moves
+import random
+
+
+def _random_position(rng: random.Random) -> tuple:
+    """Get random, non-overlapping (own, opp) bitboards."""
+    own = opp = 0
+    for square in range(64):
+        cell = rng.randrange(3)
+        if cell == 1:
+            own |= 1 << square
+        elif cell == 2:
+            opp |= 1 << square
+    return own, opp
+
+
+def test_legal_moves_match_generic_code() -> None:
+    """Test that the kernel finds the same moves as the generic code."""
+    rng = random.Random(0)
+    for _ in range(500):
+        own, opp = _random_position(rng)
+        assert othello_kernels.legal_moves(own, opp) == _legal_moves(own, opp, 8)
+
+
+def test_flips_match_generic_code() -> None:
+    """Test that the lookup tables flip the same pieces as the generic code."""
+    rng = random.Random(1)
+    for _ in range(500):
+        own, opp = _random_position(rng)
+        empty = ~(own | opp) & ((1 << 64) - 1)
+        if not empty:
+            continue
+        square = rng.choice([sq for sq in range(64) if empty >> sq & 1])
+        expected = _flips(1 << square, own, opp, 8)
+        assert othello_kernels.flips(square, own, opp) == expected
+
+
+def test_high_bits() -> None:
+    """Test that squares above bit 63 of a signed int are handled."""
+    # Black on (7, 7) and white on (7, 6): black can play (7, 5)
+    own, opp = 1 << 63, 1 << 62
+    assert othello_kernels.legal_moves(own, opp) == 1 << 61
+    assert othello_kernels.flips(61, own, opp) == 1 << 62
@@ -19,13 +19,68 @@ export interface CPUMoveResponse {
   valid_moves: [number, number][]
 }
 
+// 盤面は黒・白それぞれのビットボード（ビット番号 = 行 * 8 + 列）を
+// 16桁の16進数で表し、黒・白の順に連結した32文字で送受信する
+// 有効な手も同じ番号付けのビットマスクを16桁の16進数で受け取る
+type WireGameState = Omit<ApiGameState, 'board' | 'valid_moves'> & {
+  board: string
+  valid_moves: string
+}
+type WireCPUMoveResponse = Omit<CPUMoveResponse, 'new_board' | 'valid_moves'> & {
+  new_board: string
+  valid_moves: string
+}
+
+function toHex(bitboard: bigint): string {
+  return bitboard.toString(16).padStart(16, '0')
+}
+
+function encodeBoard(board: number[][]): string {
+  let black = 0n
+  let white = 0n
+  board.forEach((row, r) => row.forEach((cell, c) => {
+    const bit = 1n << BigInt(r * 8 + c)
+    if (cell === 1) black |= bit
+    else if (cell === -1) white |= bit
+  }))
+  return toHex(black) + toHex(white)
+}
+
+function decodeBoard(encoded: string): number[][] {
+  const black = BigInt(`0x${encoded.slice(0, 16)}`)
+  const white = BigInt(`0x${encoded.slice(16, 32)}`)
+  return Array.from({ length: 8 }, (_, r) => Array.from({ length: 8 }, (_, c) => {
+    const bit = 1n << BigInt(r * 8 + c)
+    if (black & bit) return 1
+    if (white & bit) return -1
+    return 0
+  }))
+}
+
+function decodeMoves(encoded: string): [number, number][] {
+  const mask = BigInt(`0x${encoded}`)
+  const moves: [number, number][] = []
+  for (let square = 0; square < 64; square++) {
+    if ((mask >> BigInt(square)) & 1n) moves.push([Math.floor(square / 8), square % 8])
+  }
+  return moves
+}
+
+function decodeGameState(state: WireGameState): ApiGameState {
+  return {
+    ...state,
+    board: decodeBoard(state.board),
+    valid_moves: decodeMoves(state.valid_moves),
+  }
+}
+
 class OthelloAPI {
   async newGame(): Promise<ApiGameState> {
     const response = await fetch(`${API_BASE_URL}/api/game/new`)
     if (!response.ok) {
       throw new Error('Failed to start new game')
     }
-    return response.json()
+    return decodeGameState(await response.json())
   }
 
   async makeMove(board: number[][], row: number, col: number, player: number): Promise<ApiGameState> {
@@ -35,7 +90,7 @@ class OthelloAPI {
         'Content-Type': 'application/json',
       },
       body: JSON.stringify({
-        board,
+        board: encodeBoard(board),
         row,
         col,
         player,
@@ -47,35 +102,36 @@ class OthelloAPI {
       throw new Error(error.detail || 'Failed to make move')
     }
 
-    return response.json()
+    return decodeGameState(await response.json())
   }
 
   async getCPUMove(board: number[][], player: number, difficulty: number = 4): Promise<CPUMoveResponse> {
-    const response = await fetch(`${API_BASE_URL}/api/game/cpu-move`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({
-        board,
-        player,
-        difficulty,
-      }),
+    // GETにすることで同じ局面への応答をブラウザ側でもキャッシュできる
+    const params = new URLSearchParams({
+      b: encodeBoard(board),
+      p: String(player),
+      d: String(difficulty),
     })
+    const response = await fetch(`${API_BASE_URL}/api/game/cpu-move?${params}`)
 
     if (!response.ok) {
       const error = await response.json()
       throw new Error(error.detail || 'Failed to get CPU move')
     }
 
-    return response.json()
+    const data: WireCPUMoveResponse = await response.json()
+    return {
+      ...data,
+      new_board: decodeBoard(data.new_board),
+      valid_moves: decodeMoves(data.valid_moves),
+    }
   }
 
   async getValidMoves(player: number, boardState?: number[][]): Promise<[number, number][]> {
     let url = `${API_BASE_URL}/api/game/valid-moves/${player}`
     
     if (boardState) {
-      url += `?board_state=${encodeURIComponent(JSON.stringify(boardState))}`
+      url += `?board_state=${encodeBoard(boardState)}`
     }
 
     const response = await fetch(url)
@@ -83,8 +139,8 @@ class OthelloAPI {
       throw new Error('Failed to get valid moves')
     }
 
-    const data = await response.json()
-    return data.valid_moves
+    const data: { valid_moves: string } = await response.json()
+    return decodeMoves(data.valid_moves)
   }
 }
 